@@ -1,11 +1,12 @@
 import os
+from itertools import chain
 import streamlit as st
 from dotenv import load_dotenv
 from pathlib import Path
 from langchain.schema import Document
 
-from rag.loaders import load_pdf, load_markdown, load_ipynb, load_youtube_transcript, load_github_readme
-from rag.chunking import split_and_tag
+from rag.loaders import iter_pdf, load_markdown, iter_ipynb, load_youtube_transcripts, load_github_readme
+from rag.chunking import iter_split_and_tag
 from rag.index import build_chroma, load_chroma
 from graph.build_graph import compile_graph
 
@@ -14,32 +15,54 @@ st.set_page_config(page_title="Mentor Agent (NSK.AI)", layout="wide")
 st.title("🤖 Mentor Agent — NSK.AI")
 
 persist_dir = "vectorstore"
+snapshot = os.getenv("MENTOR_SNAPSHOT")  # read-only prebuilt index, see rag/snapshot.py
+
+def index_ready():
+    return bool(snapshot) or (Path(persist_dir).exists() and any(Path(persist_dir).iterdir()))
+
 graph = compile_graph()
 
 # ------ Sidebar: Build Index ------
 with st.sidebar:
     st.header("Index Builder")
-    uploaded = st.file_uploader("Upload PDFs/MD/IPYNB", type=["pdf","md","ipynb"], accept_multiple_files=True)
-    yt = st.text_input("YouTube URL (optional)")
-    gh = st.text_input("GitHub repo (owner/name) to index README (optional)")
-    if st.button("Build / Update Index"):
-        docs = []
+    if snapshot:
+        # Chat and search read only the snapshot, so anything indexed here would never be searchable
+        st.info(f"Serving read-only index snapshot `{snapshot}`. The index builder is disabled; "
+                "restart the app without MENTOR_SNAPSHOT to index new documents.")
+    uploaded = st.file_uploader("Upload PDFs/MD/IPYNB", type=["pdf","md","ipynb"], accept_multiple_files=True, disabled=bool(snapshot))
+    yt = st.text_area("YouTube video/playlist URLs, one per line (optional)", disabled=bool(snapshot))
+    gh = st.text_input("GitHub repo (owner/name) to index README (optional)", disabled=bool(snapshot))
+    if st.button("Build / Update Index", disabled=bool(snapshot)):
+        # Loaders are lazy where possible; pages/cells flow through chunking into
+        # the vector store in batches instead of being materialized up front.
+        sources = []
         if uploaded:
             Path("data").mkdir(exist_ok=True)
             for f in uploaded:
                 p = Path("data")/f.name
                 p.write_bytes(f.read())
-                if f.name.endswith(".pdf"): docs += load_pdf(p)
-                elif f.name.endswith(".md"): docs += load_markdown(p)
-                elif f.name.endswith(".ipynb"): docs += load_ipynb(p)
-        if yt: docs += load_youtube_transcript(yt)
-        if gh: docs += load_github_readme(gh)
-        if not docs:
+                if f.name.endswith(".pdf"): sources.append(iter_pdf(p))
+                elif f.name.endswith(".md"): sources.append(load_markdown(p))
+                elif f.name.endswith(".ipynb"): sources.append(iter_ipynb(p))
+        if yt.strip():
+            yt_docs, yt_errors = load_youtube_transcripts(yt.splitlines())
+            if yt_errors:
+                st.warning("Skipped YouTube videos:\n\n" + "\n".join(f"- {e}" for e in yt_errors))
+            sources.append(yt_docs)
+        if gh: sources.append(load_github_readme(gh))
+        if not sources:
             st.warning("No documents to index.")
         else:
-            chunks = split_and_tag(docs)
-            build_chroma(chunks, persist_dir=persist_dir)
-            st.success(f"Indexed {len(chunks)} chunks.")
+            stats = {"chunks": 0}
+            def _count(chunks):
+                for c in chunks:
+                    stats["chunks"] += 1
+                    yield c
+            build_chroma(_count(iter_split_and_tag(chain.from_iterable(sources))), persist_dir=persist_dir)
+            if stats["chunks"]:
+                st.success(f"Indexed {stats['chunks']} chunks.")
+            else:
+                st.warning("No documents to index.")
 
 tab1, tab2, tab3 = st.tabs(["Chat (Q&A)", "Repo Evaluator", "Knowledge Search"])
 
@@ -72,7 +95,7 @@ with tab1:
             st.session_state.chat_history.append({"role": "user", "content": q})
 
             # Call graph
-            if not (Path(persist_dir).exists() and any(Path(persist_dir).iterdir())):
+            if not index_ready():
                 answer = "Please build the index first (sidebar)."
             else:
                 out = graph.invoke({"question": q})
@@ -104,7 +127,7 @@ with tab3:
     st.subheader("Semantic search over indexed repos/materials")
     q = st.text_input("Search query (e.g., Phase One project with RAG + Pinecone)", key="search")
     if st.button("Search"):
-        if not (Path(persist_dir).exists() and any(Path(persist_dir).iterdir())):
+        if not index_ready():
             st.info("Please build the index first (sidebar).")
         else:
             out = graph.invoke({"question": q})
@@ -5,6 +5,7 @@ from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate
 from rag.prompts import SYSTEM, QA_TEMPLATE, REFLECT_PROMPT
 from rag.index import load_chroma, retriever_topk
+from rag.snapshot import open_snapshot
 from evaluator.repo_eval import evaluate_repo
 from rag.retrievers import hybrid_retrieve
 from rag.reranker import rerank
@@ -18,7 +19,9 @@ VS = None
 def _vs():
     global VS
     if VS is None:
-        VS = load_chroma("vectorstore")
+        # MENTOR_SNAPSHOT points at a prebuilt index snapshot served read-only
+        snapshot = os.getenv("MENTOR_SNAPSHOT")
+        VS = open_snapshot(snapshot) if snapshot else load_chroma("vectorstore")
     return VS
 
 # -------- Router --------
@@ -1,10 +1,17 @@
 import re
+from typing import Iterable, Iterator
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 
+CHUNK_SIZE = 1200
+CHUNK_OVERLAP = 150
+SEPARATORS = ["\n## ","\n### ","\n\n","\n"," "]
+# Recorded in index snapshots; a snapshot built with other settings is rejected
+CHUNKER_CONFIG = {"chunk_size": CHUNK_SIZE, "chunk_overlap": CHUNK_OVERLAP, "separators": SEPARATORS}
+
 SPLITTER = RecursiveCharacterTextSplitter(
-    chunk_size=1200, chunk_overlap=150,
-    separators=["\n## ","\n### ","\n\n","\n"," "]
+    chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP,
+    separators=SEPARATORS
 )
 
 LEVEL_RE = re.compile(r"(Level\s+\d+[:\-]?\s*[A-Za-z0-9 \-]*)", re.IGNORECASE)
@@ -19,13 +26,21 @@ def enrich_metadata(doc: Document, idx: int) -> Document:
     if se: meta["section"] = se.group(1).strip()
     meta["chunk_id"] = idx
     meta.setdefault("source_file", meta.get("repo") or meta.get("video_id") or meta.get("path") or "unknown")
-    meta["reference"] = f"{meta.get('level','Level ?')}, {meta.get('section','Section ?')}"
+    if "timestamp" in meta:
+        # transcript segments: point at the moment in the video instead of a level/section
+        meta["reference"] = f"{meta.get('title', meta.get('video_id'))} @ {meta['timestamp']} ({meta.get('url')})"
+    else:
+        meta["reference"] = f"{meta.get('level','Level ?')}, {meta.get('section','Section ?')}"
+        if "cell_start" in meta:
+            meta["reference"] += f", cells {meta['cell_start']}-{meta['cell_end']}"
     return Document(page_content=doc.page_content, metadata=meta)
 
-def split_and_tag(docs: list[Document]) -> list[Document]:
-    chunks = []
+def iter_split_and_tag(docs: Iterable[Document]) -> Iterator[Document]:
+    """Lazy split_and_tag: chunks each document as it arrives from a streaming loader."""
     for d in docs:
         parts = SPLITTER.split_documents([d])
         for i, p in enumerate(parts):
-            chunks.append(enrich_metadata(p, i))
-    return chunks
+            yield enrich_metadata(p, i)
+
+def split_and_tag(docs: Iterable[Document]) -> list[Document]:
+    return list(iter_split_and_tag(docs))
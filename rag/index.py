@@ -1,20 +1,41 @@
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
 from langchain.schema import Document
-from typing import List
+from typing import Iterable, Iterator, List
 
-EMB = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+from rag.model_server import RemoteEmbeddings, model_server_address
 
-def build_chroma(docs: List[Document], persist_dir: str = "vectorstore"):
-    # Try to load existing vectorstore, else create new
-    try:
-        vs = Chroma(embedding_function=EMB, persist_directory=persist_dir)
-        vs.add_documents(docs)
-    except Exception:
-        # If loading fails (e.g., directory doesn't exist), create new
-        vs = Chroma.from_documents(docs, embedding=EMB, persist_directory=persist_dir)
-        vs.persist()
-    return vs
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# With MENTOR_MODEL_SERVER set, embeddings come from the shared sidecar (rag/model_server.py)
+EMB = RemoteEmbeddings(model_server_address(), EMBEDDING_MODEL) if model_server_address() else HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+
+BATCH_SIZE = 64  # documents embedded and written per add_documents call
+
+def _batches(docs: Iterable[Document], size: int) -> Iterator[List[Document]]:
+    batch = []
+    for d in docs:
+        batch.append(d)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def build_chroma(docs: Iterable[Document], persist_dir: str = "vectorstore", batch_size: int = BATCH_SIZE):
+    # Consume docs in batches so a lazy loader -> chunker pipeline is embedded as it streams
+    vs = None
+    for batch in _batches(docs, batch_size):
+        if vs is not None:
+            vs.add_documents(batch)
+            continue
+        # Try to load existing vectorstore, else create new
+        try:
+            vs = Chroma(embedding_function=EMB, persist_directory=persist_dir)
+            vs.add_documents(batch)
+        except Exception:
+            # If loading fails (e.g., directory doesn't exist), create new
+            vs = Chroma.from_documents(batch, embedding=EMB, persist_directory=persist_dir)
+    return vs if vs is not None else load_chroma(persist_dir)
 
 def load_chroma(persist_dir: str = "vectorstore"):
     return Chroma(embedding_function=EMB, persist_directory=persist_dir)
@@ -1,29 +1,121 @@
 import os
 import re
+import html
+import tempfile
 import yt_dlp
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List
 from langchain_core.documents import Document
 from pathlib import Path
-from langchain_community.document_loaders import PyPDFLoader, TextLoader, NotebookLoader
+from urllib.parse import parse_qs, urlparse
+from langchain_community.document_loaders import PyPDFLoader, TextLoader
 from langchain.schema import Document
 from youtube_transcript_api import YouTubeTranscriptApi
 import base64, requests, json
 
+try:
+    import ijson  # optional: lets notebooks be parsed cell by cell instead of all at once
+except ImportError:
+    ijson = None
+
+MAX_OUTPUT_CHARS = 1500     # per cell output kept in the text
+MAX_TRACEBACK_LINES = 5     # last lines of an error traceback kept
+NOTEBOOK_GROUP_CHARS = 2000 # cells are grouped into Documents of roughly this size
+
+_ANSI_RE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+_DATA_URI_RE = re.compile(r'data:[\w/+.-]+;base64,[A-Za-z0-9+/=]+')
+_BASE64_RE = re.compile(r'[A-Za-z0-9+/=]{200,}')
+
+def iter_pdf(path: Path) -> Iterator[Document]:
+    """Yields PDF pages one at a time so chunking/embedding can start before the whole file is read."""
+    return PyPDFLoader(str(path)).lazy_load()
+
 def load_pdf(path: Path) -> list[Document]:
-    return PyPDFLoader(str(path)).load()
+    return list(iter_pdf(path))
 
 def load_markdown(path: Path) -> list[Document]:
     return TextLoader(str(path), encoding="utf-8").load()
 
+def _as_text(value) -> str:
+    return "".join(value) if isinstance(value, list) else (value or "")
+
+def _strip_binary(text: str) -> str:
+    # Inline data: URIs (e.g. markdown images) and long base64 runs carry nothing worth indexing
+    text = _DATA_URI_RE.sub("[binary data omitted]", text)
+    return _BASE64_RE.sub("[binary data omitted]", text)
+
+def _cap(text: str, limit: int = MAX_OUTPUT_CHARS) -> str:
+    text = _strip_binary(text)
+    return text if len(text) <= limit else text[:limit] + " ...[truncated]"
+
+def _output_text(output: dict) -> str:
+    """Text worth indexing from one code cell output; images, HTML and other rich payloads are dropped."""
+    kind = output.get("output_type")
+    if kind == "stream":
+        return _cap(_as_text(output.get("text")))
+    if kind in ("execute_result", "display_data"):
+        return _cap(_as_text(output.get("data", {}).get("text/plain")))
+    if kind == "error":
+        tb = [_ANSI_RE.sub("", line) for line in output.get("traceback", [])]
+        tail = "\n".join(tb[-MAX_TRACEBACK_LINES:])
+        return _cap(f"{output.get('ename', 'Error')}: {output.get('evalue', '')}\n{tail}")
+    return ""
+
+def _cell_text(cell: dict) -> str:
+    source = _strip_binary(_as_text(cell.get("source"))).strip()
+    if cell.get("cell_type") != "code":
+        return source
+    parts = [f"```python\n{source}\n```"] if source else []
+    outputs = [t for t in (_output_text(o) for o in cell.get("outputs", [])) if t.strip()]
+    if outputs:
+        parts.append("Output:\n" + "\n".join(outputs))
+    return "\n".join(parts)
+
+def _iter_cells(path: Path) -> Iterator[dict]:
+    with open(path, "rb") as f:
+        if ijson is not None:
+            yield from ijson.items(f, "cells.item")
+        else:
+            yield from json.load(f).get("cells", [])
+
+def iter_ipynb(path: Path) -> Iterator[Document]:
+    """
+    Streams a notebook as Documents, one per group of consecutive cells.
+    A markdown heading after body cells starts a new group, as does reaching
+    NOTEBOOK_GROUP_CHARS.
+    Cell outputs are capped and binary/rich outputs dropped, so large executed
+    notebooks index their content rather than their plots.
+    """
+    path = Path(path)
+    buf, size, first = [], 0, None
+
+    def doc(last):
+        return Document(
+            page_content="\n\n".join(buf),
+            metadata={"source_file": path.name, "type": "ipynb", "cell_start": first, "cell_end": last},
+        )
+
+    last, has_body = None, False
+    for i, cell in enumerate(_iter_cells(path)):
+        text = _cell_text(cell)
+        if not text:
+            continue
+        heading = cell.get("cell_type") == "markdown" and text.startswith("#")
+        # consecutive headings stay together with the body that follows them
+        if buf and ((heading and has_body) or size + len(text) > NOTEBOOK_GROUP_CHARS):
+            yield doc(last)
+            buf, size, has_body = [], 0, False
+        if not buf:
+            first = i
+        buf.append(text)
+        size += len(text)
+        has_body = has_body or not heading
+        last = i
+    if buf:
+        yield doc(last)
+
 def load_ipynb(path: Path) -> list[Document]:
-    # Prefer LangChain’s NotebookLoader; fallback if needed
-    try:
-        return NotebookLoader(str(path)).load()
-    except Exception:
-        data = json.loads(path.read_text(encoding="utf-8"))
-        cells = data.get("cells", [])
-        text = "\n".join("".join(c.get("source", [])) for c in cells)
-        return [Document(page_content=text, metadata={"source_file": path.name, "type": "ipynb"})]
+    return list(iter_ipynb(path))
 
 #def load_youtube_transcript(url_or_id: str) -> list[Document]:
 #    vid = url_or_id.split("v=")[-1].split("&")[0] if "youtube" in url_or_id else url_or_id
@@ -31,97 +123,220 @@ def load_ipynb(path: Path) -> list[Document]:
 #    text = " ".join([t.text for t in transcript])
 #    return [Document(page_content=text, metadata={"source": "youtube", "video_id": vid, "type":"youtube"})]
 
-def _parse_transcript(raw_text: str) -> str:
+TRANSCRIPT_CACHE_DIR = Path(".cache") / "transcripts"
+SEGMENT_CHARS = 1000  # transcript text per Document, kept under the chunk size so each chunk keeps its timestamp
+
+_CUE_RE = re.compile(r'^((?:\d+:)?\d{2}:\d{2}\.\d{3})\s+-->\s+((?:\d+:)?\d{2}:\d{2}\.\d{3})')
+_VIDEO_ID_RE = re.compile(r'(?:v=|youtu\.be/|/shorts/|/embed/)([\w-]{11})')
+
+def _vtt_seconds(ts: str) -> float:
+    h, m, s = (["0"] + ts.split(":"))[-3:]
+    return int(h) * 3600 + int(m) * 60 + float(s)
+
+def _clean_caption(line: str) -> str:
+    # Drop inline timing/style tags, bracketed sound descriptions and "> " speaker markers
+    line = re.sub(r'<[^>]+>', '', line)
+    line = re.sub(r'\[.*?\]', '', line)
+    line = html.unescape(line).strip().lstrip('> ').strip()
+    return re.sub(r'\s+', ' ', line)
+
+def parse_vtt(lines: Iterable[str]) -> list[dict]:
     """
-    Parses and cleans the raw transcript output from yt-dlp.
-    Removes timestamps, metadata, and duplicate lines.
+    Parses WEBVTT captions in a single pass over `lines` (a file object works).
+    Returns cues as {"start", "end", "text"} in seconds, skipping the header,
+    cue identifiers and the repeated lines of YouTube's rolling auto-captions.
     """
+    cues = []
+    last_line = None
+    cue = None
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        m = _CUE_RE.match(line)
+        if m:
+            cue = {"start": _vtt_seconds(m.group(1)), "end": _vtt_seconds(m.group(2)), "text": []}
+            cues.append(cue)
+            continue
+        if not line:
+            cue = None  # only an empty line ends the cue; anything before the next timing line is ignored
+            continue
+        if cue is None or not line.strip():
+            continue  # YouTube auto-captions open each cue with a " " line
+        text = _clean_caption(line)
+        if text and text != last_line:
+            cue["text"].append(text)
+            last_line = text
+    return [
+        {"start": c["start"], "end": c["end"], "text": " ".join(c["text"])}
+        for c in cues if c["text"]
+    ]
 
-    # 1. Remove XML-like tags, e.g., <c> </c>
-    text = re.sub(r'<[^>]+>', '', raw_text)
-    # 2. Remove bracketed sound descriptions, e.g., [ CHEERS AND APPLAUSE ]
-    text = re.sub(r'\[.*?\]', '', text)
-    # 3. Remove metadata headers like "Kind: captions Language: en"
-    text = re.sub(r'^Kind:.*?\n', '', text, flags=re.MULTILINE)
-    # 4. Remove WEBVTT header if present
-    text = re.sub(r'^WEBVTT.*\n', '', text, flags=re.MULTILINE)
-    # 5. Remove timestamp lines in VTT format
-    text = re.sub(
-        r'\d{2}:\d{2}:\d{2}\.\d{3} --> \d{2}:\d{2}:\d{2}\.\d{3}.*\n',
-        '',
-        text
-    )
-    # 6. Split into lines, clean up, and remove duplicates
-    lines = text.strip().split('\n')
-    cleaned_lines = []
-    for line in lines:
-        clean_line = line.strip().lstrip('> ').strip()
-        if clean_line and (not cleaned_lines or cleaned_lines[-1] != clean_line):
-            cleaned_lines.append(clean_line)
-    # 7. Join and normalize whitespace
-    final_text = " ".join(cleaned_lines)
-    return re.sub(r'\s+', ' ', final_text).strip()
+def _video_id(url_or_id: str) -> str | None:
+    m = _VIDEO_ID_RE.search(url_or_id)
+    if m:
+        return m.group(1)
+    if re.fullmatch(r'[\w-]{11}', url_or_id):
+        return url_or_id
+    return None
 
-def load_youtube_transcript(youtube_url: str) -> List[Document]:
+def _timestamp(seconds: float) -> str:
+    s = int(seconds)
+    return f"{s // 3600:d}:{s % 3600 // 60:02d}:{s % 60:02d}"
+
+def _transcript_documents(video_id: str, cues: list[dict], title: str | None = None) -> List[Document]:
+    """Groups cues into ~SEGMENT_CHARS Documents carrying start/end times and a jump-to URL."""
+    docs = []
+    buf, size, start, end = [], 0, None, None
+
+    def flush():
+        docs.append(Document(
+            page_content=" ".join(buf),
+            metadata={
+                "source": "youtube", "type": "youtube", "video_id": video_id,
+                "title": title or video_id,
+                "start": start, "end": end, "timestamp": _timestamp(start),
+                "url": f"https://www.youtube.com/watch?v={video_id}&t={int(start)}s",
+            },
+        ))
+
+    for c in cues:
+        if start is None:
+            start = c["start"]
+        buf.append(c["text"])
+        size += len(c["text"]) + 1
+        end = c["end"]
+        if size >= SEGMENT_CHARS:
+            flush()
+            buf, size, start = [], 0, None
+    if buf:
+        flush()
+    return docs
+
+def load_vtt(path: Path, video_id: str, title: str | None = None) -> List[Document]:
+    """Loads a local .vtt caption file as timestamped transcript Documents (no network)."""
+    with open(path, "r", encoding="utf-8") as f:
+        cues = parse_vtt(f)
+    return _transcript_documents(video_id, cues, title)
+
+def _read_cached_transcript(cache_dir: Path, video_id: str) -> dict | None:
+    p = cache_dir / f"{video_id}.json"
+    if not p.exists():
+        return None
+    try:
+        return json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+def _write_cached_transcript(cache_dir: Path, entry: dict) -> None:
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Write then rename so concurrent builds never see a half-written entry
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp, cache_dir / f"{entry['video_id']}.json")
+
+def _playlist_id(url: str) -> str | None:
+    return (parse_qs(urlparse(url).query).get("list") or [None])[0]
+
+def _expand_youtube_urls(urls: Iterable[str]) -> tuple[list[str], list[str]]:
     """
-    Downloads a transcript from YouTube using yt-dlp, parses it, and returns it
-    as a list containing a single LangChain Document.
+    Resolves URLs to de-duplicated video ids. Any URL carrying `list=` (including
+    `watch?v=ID&list=...`, the link YouTube shares from inside a playlist) is
+    expanded to the whole playlist (flat, no per-video requests).
+    Returns (video_ids, errors).
     """
-    # Use a temporary file name template
-    temp_filename_template = "temp_transcript_%(id)s"
-
-    # We ask for the 'live_chat' format when available as it often has a 
-    # cleaner text structure, but we will clean it regardless.
-    ydl_opts = {
-        'format': 'best',
-        'writesubtitles': True,
-        'writeautomaticsub': True,
-        'subtitleslangs': ['en'],
-        'subtitlesformat': 'vtt', # Request VTT format specifically
-        'skip_download': True,
-        'outtmpl': temp_filename_template,
-        'quiet': True,
-        'ignoreerrors': True,
-    }
-
-    transcript_text = ""
-    downloaded_file = None
-    
-    try:
+    ids, errors = [], []
+    for url in urls:
+        url = url.strip()
+        if not url:
+            continue
+        playlist = _playlist_id(url)
+        vid = _video_id(url)
+        if vid and not playlist:
+            ids.append(vid)
+            continue
+        target = f"https://www.youtube.com/playlist?list={playlist}" if playlist else url
+        try:
+            with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True, 'extract_flat': 'in_playlist'}) as ydl:
+                info = ydl.extract_info(target, download=False)
+        except Exception as e:
+            if vid:
+                ids.append(vid)  # still index the video the link pointed at
+            errors.append(f"{url}: {e}")
+            continue
+        entries = (info or {}).get("entries") or [info or {}]
+        ids += [e["id"] for e in entries if e and e.get("id")]
+    return list(dict.fromkeys(ids)), errors
+
+def _fetch_transcript(video_id: str, cache_dir: Path) -> dict:
+    cached = _read_cached_transcript(cache_dir, video_id)
+    if cached is not None:
+        return cached
+
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    # Each fetch gets its own temp dir so parallel workers and concurrent builds don't collide
+    with tempfile.TemporaryDirectory(prefix="yt_transcript_") as tmp:
+        ydl_opts = {
+            'writesubtitles': True,
+            'writeautomaticsub': True,
+            'subtitleslangs': ['en'],
+            'subtitlesformat': 'vtt',
+            'skip_download': True,
+            'noplaylist': True,
+            'outtmpl': os.path.join(tmp, '%(id)s'),
+            'quiet': True,
+            'no_warnings': True,
+        }
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info_dict = ydl.extract_info(youtube_url, download=False)
-            video_id = info_dict.get('id', 'default')
-            
-            # Construct the expected filename
-            expected_filename = f"temp_transcript_{video_id}.en.vtt"
-            
-            # Trigger the download
-            ydl.download([youtube_url])
-
-            if os.path.exists(expected_filename):
-                downloaded_file = expected_filename
-                with open(downloaded_file, 'r', encoding='utf-8') as f:
-                    raw_content = f.read()
-                transcript_text = _parse_transcript(raw_content)
-            else:
-                raise FileNotFoundError("yt-dlp failed to download the transcript file in VTT format.")
-
-    except Exception as e:
-        raise RuntimeError(f"Failed to process youtube video {youtube_url}: {e}")
-    finally:
-        # Clean up the downloaded file
-        if downloaded_file and os.path.exists(downloaded_file):
-            os.remove(downloaded_file)
-
-    if not transcript_text:
+            # A single extract_info(download=True) resolves metadata and writes the subtitle file
+            info = ydl.extract_info(url, download=True)
+        vtt = next(Path(tmp).glob("*.vtt"), None)
+        if vtt is None:
+            raise FileNotFoundError("yt-dlp failed to download the transcript file in VTT format.")
+        with open(vtt, "r", encoding="utf-8") as f:
+            cues = parse_vtt(f)
+
+    if not cues:
         raise ValueError("Could not extract any text from the transcript.")
+    entry = {"video_id": video_id, "title": (info or {}).get("title"), "cues": cues}
+    _write_cached_transcript(cache_dir, entry)
+    return entry
+
+def load_youtube_transcripts(urls: Iterable[str], max_workers: int = 4,
+                             cache_dir: Path = TRANSCRIPT_CACHE_DIR) -> tuple[List[Document], List[str]]:
+    """
+    Loads transcripts for a list of video and/or playlist URLs. Videos are fetched
+    concurrently with at most `max_workers` yt-dlp calls in flight; parsed
+    transcripts are cached per video id under `cache_dir`, so re-indexing only
+    downloads videos not seen before. Videos or playlists that fail are skipped
+    and returned as messages: the result is (docs, errors).
+    """
+    cache_dir = Path(cache_dir)
+    video_ids, errors = _expand_youtube_urls(urls)
+    docs = []
+    if not video_ids:
+        return docs, errors
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(video_ids)))) as pool:
+        futures = [pool.submit(_fetch_transcript, vid, cache_dir) for vid in video_ids]
+        for vid, fut in zip(video_ids, futures):
+            try:
+                entry = fut.result()
+            except Exception as e:
+                errors.append(f"{vid}: {e}")
+                continue
+            docs += _transcript_documents(vid, entry["cues"], entry.get("title"))
 
-    doc = Document(
-        page_content=transcript_text,
-        metadata={"source": "youtube", "video_id": youtube_url, "type":"youtube"}
-    )
+    return docs, errors
 
-    return [doc]
+def load_youtube_transcript(youtube_url: str) -> List[Document]:
+    """
+    Downloads (or reads from cache) the transcript of one YouTube video and
+    returns it as timestamped Documents.
+    """
+    docs, errors = load_youtube_transcripts([youtube_url], max_workers=1)
+    if not docs:
+        raise RuntimeError(f"Failed to process youtube video {youtube_url}: " + "; ".join(errors or ["no transcript found"]))
+    return docs
 
 def load_github_readme(owner_repo: str) -> list[Document]:
     api = f"https://api.github.com/repos/{owner_repo}/readme"
@@ -0,0 +1,283 @@
+# rag/model_server.py
+"""
+Optional local inference sidecar.
+
+One process hosts the embedding model and the cross-encoder; app workers reach
+it over a Unix socket or local HTTP instead of each loading their own copy.
+Concurrent embed/rerank requests that arrive within a short window are run as
+one model batch.
+
+    python -m rag.model_server --address unix:/tmp/mentor-models.sock
+    MENTOR_MODEL_SERVER=unix:/tmp/mentor-models.sock streamlit run app.py
+
+With MENTOR_MODEL_SERVER set, rag.index.EMB and rag.reranker.RERANKER are
+clients of the sidecar, so retriever_topk, hybrid_retrieve and rerank use it
+without changes.
+"""
+import argparse
+import http.client
+import json
+import os
+import queue
+import socket
+import socketserver
+import stat
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+from urllib.parse import urlparse
+
+from langchain_core.embeddings import Embeddings
+
+MODEL_SERVER_ENV = "MENTOR_MODEL_SERVER"
+DEFAULT_ADDRESS = "unix:/tmp/mentor-models.sock"
+BATCH_WINDOW_MS = 5.0   # how long the first request of a batch waits for others
+MAX_BATCH = 128         # texts / pairs per model call
+
+def model_server_address() -> Optional[str]:
+    return os.getenv(MODEL_SERVER_ENV) or None
+
+# -------- Micro-batching --------
+class MicroBatcher:
+    """
+    Serializes calls to `fn` (list of inputs -> list of outputs) on one worker
+    thread. Requests queued within `window_ms` of the first one, up to
+    `max_batch` inputs, are concatenated into a single call. window_ms=0 runs
+    each request on its own.
+    """
+
+    def __init__(self, fn: Callable[[list], list], window_ms: float = BATCH_WINDOW_MS, max_batch: int = MAX_BATCH):
+        self._fn = fn
+        self._window = window_ms / 1000.0
+        self._max_batch = max_batch
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, items: list) -> list:
+        fut = Future()
+        self._queue.put((list(items), fut))
+        return fut.result()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self._window
+        while self._window > 0 and size < self._max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            flat = [x for items, _ in batch for x in items]
+            try:
+                out = list(self._fn(flat)) if flat else []
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            i = 0
+            for items, fut in batch:
+                fut.set_result(out[i:i + len(items)])
+                i += len(items)
+
+# -------- Server --------
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/health":
+            self._reply(200, self.server.info)
+        else:
+            self._reply(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if self.path == "/embed":
+                self._reply(200, {"embeddings": self.server.embedder.submit(body["texts"])})
+            elif self.path == "/rerank":
+                self._reply(200, {"scores": self.server.reranker.submit([tuple(p) for p in body["pairs"]])})
+            else:
+                self._reply(404, {"error": f"unknown path {self.path}"})
+        except Exception as e:
+            self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def _reply(self, status: int, payload: dict):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128  # many workers may connect at once
+
+    def get_request(self):
+        # Unix socket peers have no (host, port); BaseHTTPRequestHandler expects one
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+class _TCPHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+def _remove_stale_socket(path: str) -> None:
+    """Unlinks `path` only if it is a Unix socket nobody is listening on."""
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError(f"{path} exists and is not a socket; refusing to replace it")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.remove(path)  # stale socket left by a sidecar that exited
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"a model server is already listening on {path}")
+
+def make_server(address: str, embed_fn: Callable[[list], list], rerank_fn: Callable[[list], list],
+                window_ms: float = BATCH_WINDOW_MS, max_batch: int = MAX_BATCH, info: Optional[dict] = None):
+    """Builds (but does not start) a sidecar server around the given batch functions."""
+    if address.startswith("unix:"):
+        path = address[len("unix:"):]
+        _remove_stale_socket(path)
+        server = _UnixHTTPServer(path, _Handler)
+    else:
+        u = urlparse(address)
+        server = _TCPHTTPServer((u.hostname or "127.0.0.1", u.port or 8765), _Handler)
+    server.embedder = MicroBatcher(embed_fn, window_ms, max_batch)
+    server.reranker = MicroBatcher(rerank_fn, window_ms, max_batch)
+    server.info = dict(info or {}, window_ms=window_ms, max_batch=max_batch)
+    return server
+
+def serve(address: str = DEFAULT_ADDRESS, window_ms: float = BATCH_WINDOW_MS, max_batch: int = MAX_BATCH):
+    # The sidecar must load the models itself, not become a client of itself
+    os.environ.pop(MODEL_SERVER_ENV, None)
+    from rag.index import EMB, EMBEDDING_MODEL
+    from rag.reranker import RERANKER, RERANKER_MODEL
+
+    server = make_server(
+        address,
+        embed_fn=EMB.embed_documents,
+        rerank_fn=lambda pairs: [float(s) for s in RERANKER.predict(pairs)],
+        window_ms=window_ms, max_batch=max_batch,
+        info={"embedding_model": EMBEDDING_MODEL, "reranker_model": RERANKER_MODEL},
+    )
+    print(f"Model server listening on {address} (batch window {window_ms} ms, max batch {max_batch})")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+# -------- Client --------
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._path)
+
+class ModelServerClient:
+    """Thread-safe client; opens one short-lived connection per request."""
+
+    def __init__(self, address: str, timeout: float = 60.0):
+        self.address = address
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._checked = set()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.address.startswith("unix:"):
+            return _UnixHTTPConnection(self.address[len("unix:"):], self.timeout)
+        u = urlparse(self.address)
+        return http.client.HTTPConnection(u.hostname or "127.0.0.1", u.port or 8765, timeout=self.timeout)
+
+    def _request(self, method: str, path: str, payload: Optional[dict] = None) -> dict:
+        conn = self._connection()
+        try:
+            body = json.dumps(payload).encode("utf-8") if payload is not None else None
+            conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            data = json.loads(resp.read() or b"{}")
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            raise RuntimeError(f"Model server {self.address} unreachable: {e}")
+        finally:
+            conn.close()
+        if resp.status != 200:
+            raise RuntimeError(f"Model server {self.address} error: {data.get('error', resp.status)}")
+        return data
+
+    def health(self) -> dict:
+        return self._request("GET", "/health")
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return self._request("POST", "/embed", {"texts": list(texts)})["embeddings"]
+
+    def rerank(self, pairs) -> List[float]:
+        return self._request("POST", "/rerank", {"pairs": [list(p) for p in pairs]})["scores"]
+
+    def check_model(self, key: str, expected: str) -> None:
+        """Raises unless the sidecar's /health reports `expected` for `key`; checked once per client."""
+        with self._lock:
+            if key in self._checked:
+                return
+            served = self.health().get(key)
+            if served != expected:
+                raise RuntimeError(
+                    f"Model server {self.address} serves {key}={served!r}, but this node is configured for {expected!r}"
+                )
+            self._checked.add(key)
+
+class RemoteEmbeddings(Embeddings):
+    """Drop-in for HuggingFaceEmbeddings backed by the sidecar."""
+
+    def __init__(self, address: str, model_name: str):
+        self.client = ModelServerClient(address)
+        self.model_name = model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.client.check_model("embedding_model", self.model_name)
+        return self.client.embed(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+class RemoteCrossEncoder:
+    """Drop-in for CrossEncoder.predict backed by the sidecar."""
+
+    def __init__(self, address: str, model_name: str):
+        self.client = ModelServerClient(address)
+        self.model_name = model_name
+
+    def predict(self, pairs, **kwargs) -> List[float]:
+        self.client.check_model("reranker_model", self.model_name)
+        return self.client.rerank(pairs)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m rag.model_server", description="Serve the embedder and reranker to local app workers.")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help="unix:/path.sock or http://127.0.0.1:PORT")
+    parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW_MS, help="micro-batching window; 0 disables batching")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    args = parser.parse_args()
+    serve(args.address, args.window_ms, args.max_batch)
@@ -1,8 +1,14 @@
 # rag/reranker.py
-from sentence_transformers import CrossEncoder
+from rag.model_server import RemoteCrossEncoder, model_server_address
 
-# Load once
-RERANKER = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+# Load once (or use the shared sidecar when MENTOR_MODEL_SERVER is set)
+if model_server_address():
+    RERANKER = RemoteCrossEncoder(model_server_address(), RERANKER_MODEL)
+else:
+    from sentence_transformers import CrossEncoder
+    RERANKER = CrossEncoder(RERANKER_MODEL)
 
 def rerank(question, docs, top_k=4):
     pairs = [(question, d.page_content) for d in docs]
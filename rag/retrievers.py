@@ -7,14 +7,18 @@ def hybrid_retrieve(question, vs, k=4):
     # Dense retrieval (from Chroma retriever)
     dense_docs = retriever_topk(vs, question, k=k)
 
-    # Get all docs stored in Chroma (flat texts)
-    vs_data = vs.get()
-    # vs_data["documents"] is a list of lists (1 list per vector/embedding)
-    all_texts = [doc for docs in vs_data["documents"] for doc in docs]
+    if hasattr(vs, "sparse_search"):
+        # Index snapshots ship a prebuilt BM25 index
+        sparse_docs = vs.sparse_search(question, k=k)
+    else:
+        # Get all docs stored in Chroma (flat texts)
+        vs_data = vs.get()
+        # vs_data["documents"] is a list of lists (1 list per vector/embedding)
+        all_texts = [doc for docs in vs_data["documents"] for doc in docs]
 
-    # Sparse retrieval (BM25 over raw texts)
-    bm25 = BM25Retriever.from_texts(all_texts)
-    sparse_docs = bm25.get_relevant_documents(question)[:k]
+        # Sparse retrieval (BM25 over raw texts)
+        bm25 = BM25Retriever.from_texts(all_texts)
+        sparse_docs = bm25.get_relevant_documents(question)[:k]
 
     # Merge results
     docs = dense_docs + sparse_docs
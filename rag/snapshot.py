@@ -0,0 +1,284 @@
+# rag/snapshot.py
+"""
+Portable index snapshots.
+
+A snapshot is a directory holding everything a node needs to serve retrieval
+without re-running the loaders or re-embedding:
+
+    manifest.json   format version, embedding model, chunker settings, counts, sha256 of each file
+    vectors.npy     float32 (n, dim) unit-normalized embeddings, row i <-> line i of chunks.jsonl
+    chunks.jsonl    {"id", "text", "metadata"} per chunk
+    sparse.json     BM25 postings over the same chunks
+
+The manifest's embedding_model and chunker fields are asserted by the
+exporting node (its rag.index / rag.chunking configuration), not detected
+from the data; export only checks that the vector dimension matches the
+configured model.
+
+CLI (run from the repo root):
+
+    python -m rag.snapshot export snapshots/v1 [--from vectorstore]
+    python -m rag.snapshot verify snapshots/v1
+    python -m rag.snapshot import snapshots/v1 [--into vectorstore]
+"""
+import argparse
+import hashlib
+import json
+import math
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from langchain.schema import Document
+
+from rag.chunking import CHUNKER_CONFIG
+from rag.index import EMB, EMBEDDING_MODEL, load_chroma
+
+FORMAT = "mentoragent-index-snapshot"
+VERSION = 1
+FILES = ("vectors.npy", "chunks.jsonl", "sparse.json")
+
+# Same defaults as rank_bm25.BM25Okapi, which BM25Retriever uses
+BM25_K1 = 1.5
+BM25_B = 0.75
+BM25_EPSILON = 0.25
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _tokenize(text: str) -> list[str]:
+    # BM25Retriever's default preprocessing
+    return text.split()
+
+def _build_sparse(texts: list[str]) -> dict:
+    postings = {}
+    doc_len = []
+    for i, text in enumerate(texts):
+        tf = Counter(_tokenize(text))
+        doc_len.append(sum(tf.values()))
+        for term, n in tf.items():
+            postings.setdefault(term, []).append([i, n])
+    n_docs = len(texts)
+    idf = {t: math.log(n_docs - len(p) + 0.5) - math.log(len(p) + 0.5) for t, p in postings.items()}
+    floor = BM25_EPSILON * (sum(idf.values()) / len(idf)) if idf else 0.0
+    idf = {t: (v if v >= 0 else floor) for t, v in idf.items()}
+    return {
+        "k1": BM25_K1, "b": BM25_B,
+        "avgdl": (sum(doc_len) / n_docs) if n_docs else 0.0,
+        "doc_len": doc_len, "idf": idf, "postings": postings,
+    }
+
+def compatibility_problems(manifest: dict) -> list[str]:
+    """Differences between a snapshot manifest and this node's embedding/chunking configuration."""
+    problems = []
+    if manifest.get("format") != FORMAT or manifest.get("version") != VERSION:
+        problems.append(f"unsupported snapshot format {manifest.get('format')} v{manifest.get('version')}")
+    if manifest.get("embedding_model") != EMBEDDING_MODEL:
+        problems.append(f"embedding model {manifest.get('embedding_model')!r} != configured {EMBEDDING_MODEL!r}")
+    if manifest.get("chunker") != CHUNKER_CONFIG:
+        problems.append(f"chunker settings {manifest.get('chunker')} != configured {CHUNKER_CONFIG}")
+    return problems
+
+def export_snapshot(out_dir: str, persist_dir: str = "vectorstore") -> dict:
+    """
+    Writes the contents of a Chroma vectorstore as a snapshot; returns the manifest.
+    The manifest is stamped with this node's EMBEDDING_MODEL and CHUNKER_CONFIG,
+    so export from a node configured like the one that built `persist_dir`.
+    """
+    # Checked first: load_chroma would quietly create an empty store at a missing path
+    if not (Path(persist_dir).is_dir() and any(Path(persist_dir).iterdir())):
+        raise ValueError(f"vectorstore {persist_dir} not found; nothing to export")
+    data = load_chroma(persist_dir).get(include=["embeddings", "documents", "metadatas"])
+    ids, texts, metas = data["ids"], data["documents"], data["metadatas"]
+    if not ids:
+        raise ValueError(f"vectorstore {persist_dir} is empty; nothing to export")
+    vectors = np.asarray(data["embeddings"], dtype=np.float32).reshape(len(ids), -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1, norms)
+    # The only check that the store was built with the configured model
+    dim = len(EMB.embed_query(""))
+    if vectors.shape[1] != dim:
+        raise ValueError(
+            f"vectorstore {persist_dir} has {vectors.shape[1]}-dim vectors but {EMBEDDING_MODEL} "
+            f"produces {dim}; it was built with a different embedding model"
+        )
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    np.save(out / "vectors.npy", vectors)
+    with open(out / "chunks.jsonl", "w", encoding="utf-8") as f:
+        for id_, text, meta in zip(ids, texts, metas):
+            f.write(json.dumps({"id": id_, "text": text, "metadata": meta or {}}, ensure_ascii=False) + "\n")
+    with open(out / "sparse.json", "w", encoding="utf-8") as f:
+        json.dump(_build_sparse(texts), f, ensure_ascii=False)
+
+    manifest = {
+        "format": FORMAT,
+        "version": VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "embedding_model": EMBEDDING_MODEL,
+        "dim": int(vectors.shape[1]),
+        "count": len(ids),
+        "chunker": CHUNKER_CONFIG,
+        "files": {name: _sha256(out / name) for name in FILES},
+    }
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+def _read_manifest(path: Path) -> dict:
+    try:
+        return json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise ValueError(f"{path} is not a readable index snapshot: {e}")
+
+def verify_snapshot(path: str) -> list[str]:
+    """Checks configuration compatibility, file hashes and row counts. Returns a list of problems (empty = ok)."""
+    path = Path(path)
+    manifest = _read_manifest(path)
+    problems = compatibility_problems(manifest)
+    for name in FILES:
+        f = path / name
+        if not f.exists():
+            problems.append(f"missing {name}")
+        elif _sha256(f) != manifest.get("files", {}).get(name):
+            problems.append(f"content hash mismatch for {name}")
+    if problems:
+        return problems
+
+    vectors = np.load(path / "vectors.npy", mmap_mode="r")
+    with open(path / "chunks.jsonl", "rb") as f:
+        n_chunks = sum(1 for _ in f)
+    count, dim = manifest.get("count"), manifest.get("dim")
+    missing = [k for k, v in (("count", count), ("dim", dim)) if v is None]
+    if missing:
+        problems.append("manifest missing " + "/".join(missing))
+    if count is not None and not (vectors.shape[0] == n_chunks == count):
+        problems.append(f"row counts differ: vectors={vectors.shape[0]} chunks={n_chunks} manifest={count}")
+    if dim is not None and vectors.ndim == 2 and vectors.shape[1] != dim:
+        problems.append(f"vector dim {vectors.shape[1]} != manifest dim {dim}")
+    return problems
+
+class SnapshotStore:
+    """
+    Read-only vector store over a snapshot directory. Opening only reads the
+    manifest and memory-maps the vectors; chunk texts and the sparse index are
+    loaded on first use. Implements the parts of the Chroma API used by
+    rag.index / rag.retrievers (similarity_search, get) plus sparse_search.
+    """
+
+    def __init__(self, path: str, verify: bool = False):
+        self.path = Path(path)
+        self.manifest = _read_manifest(self.path)
+        problems = verify_snapshot(self.path) if verify else compatibility_problems(self.manifest)
+        if problems:
+            raise ValueError(f"Refusing index snapshot {self.path}: " + "; ".join(problems))
+        self.vectors = np.load(self.path / "vectors.npy", mmap_mode="r")
+        self._chunks = None
+        self._sparse = None
+
+    def _load_chunks(self) -> list[dict]:
+        if self._chunks is None:
+            with open(self.path / "chunks.jsonl", "r", encoding="utf-8") as f:
+                self._chunks = [json.loads(line) for line in f]
+        return self._chunks
+
+    def _doc(self, i: int) -> Document:
+        c = self._load_chunks()[i]
+        return Document(page_content=c["text"], metadata=c["metadata"])
+
+    def similarity_search(self, query: str, k: int = 4) -> list[Document]:
+        if not len(self.vectors):
+            return []
+        q = np.asarray(EMB.embed_query(query), dtype=np.float32)
+        scores = self.vectors @ (q / (np.linalg.norm(q) or 1.0))
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [self._doc(i) for i in top[np.argsort(-scores[top])]]
+
+    def sparse_search(self, query: str, k: int = 4) -> list[Document]:
+        """BM25 over the snapshot's precomputed postings (no per-query index rebuild)."""
+        if self._sparse is None:
+            with open(self.path / "sparse.json", "r", encoding="utf-8") as f:
+                self._sparse = json.load(f)
+        sp = self._sparse
+        k1, b, avgdl, doc_len = sp["k1"], sp["b"], sp["avgdl"] or 1.0, sp["doc_len"]
+        scores = Counter()
+        for term in _tokenize(query):
+            idf = sp["idf"].get(term)
+            if idf is None:
+                continue
+            for i, tf in sp["postings"][term]:
+                scores[i] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len[i] / avgdl))
+        return [self._doc(i) for i, _ in scores.most_common(k)]
+
+    def get(self, include=None) -> dict:
+        chunks = self._load_chunks()
+        return {
+            "ids": [c["id"] for c in chunks],
+            "documents": [c["text"] for c in chunks],
+            "metadatas": [c["metadata"] for c in chunks],
+        }
+
+def open_snapshot(path: str, verify: bool = False) -> SnapshotStore:
+    return SnapshotStore(path, verify=verify)
+
+def import_snapshot(path: str, persist_dir: str = "vectorstore", batch_size: int = 512):
+    """Verifies a snapshot and loads it into a writable Chroma store without re-embedding."""
+    problems = verify_snapshot(path)
+    if problems:
+        raise ValueError(f"Refusing index snapshot {path}: " + "; ".join(problems))
+    snap = SnapshotStore(path)
+    chunks = snap._load_chunks()
+    vs = load_chroma(persist_dir)
+    for start in range(0, len(chunks), batch_size):
+        batch = chunks[start:start + batch_size]
+        vs._collection.upsert(
+            ids=[c["id"] for c in batch],
+            embeddings=snap.vectors[start:start + len(batch)].tolist(),
+            documents=[c["text"] for c in batch],
+            metadatas=[c["metadata"] or None for c in batch],
+        )
+    return vs
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m rag.snapshot", description="Export, import and verify index snapshots.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("export", help="write a snapshot from a Chroma vectorstore")
+    p.add_argument("snapshot")
+    p.add_argument("--from", dest="persist_dir", default="vectorstore")
+    p = sub.add_parser("import", help="load a snapshot into a Chroma vectorstore")
+    p.add_argument("snapshot")
+    p.add_argument("--into", dest="persist_dir", default="vectorstore")
+    p = sub.add_parser("verify", help="check hashes, counts and model/chunker compatibility")
+    p.add_argument("snapshot")
+    args = parser.parse_args(argv)
+
+    try:
+        return _run(args)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+def _run(args) -> int:
+    if args.cmd == "export":
+        m = export_snapshot(args.snapshot, args.persist_dir)
+        print(f"Exported {m['count']} chunks ({m['embedding_model']}, dim {m['dim']}) to {args.snapshot}")
+    elif args.cmd == "import":
+        import_snapshot(args.snapshot, args.persist_dir)
+        print(f"Imported {args.snapshot} into {args.persist_dir}")
+    else:
+        problems = verify_snapshot(args.snapshot)
+        if problems:
+            print("Snapshot verification failed:\n" + "\n".join(f"- {p}" for p in problems))
+            return 1
+        print(f"Snapshot {args.snapshot} OK")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
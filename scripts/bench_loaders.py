@@ -0,0 +1,61 @@
+"""
+Compares the streaming loaders against the previous eager ones on the files in data/.
+Notebooks are compared with both paths of the old load_ipynb: NotebookLoader
+(outputs excluded by default) and its json.loads fallback.
+Reports wall time, time to the first Document and peak Python heap (tracemalloc).
+
+    python scripts/bench_loaders.py [data_dir]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from langchain_community.document_loaders import PyPDFLoader, NotebookLoader
+from langchain.schema import Document
+from rag.loaders import iter_pdf, iter_ipynb
+
+def json_fallback(path: Path) -> list[Document]:
+    # The old load_ipynb fallback: whole file through json.loads, one Document
+    data = json.loads(path.read_text(encoding="utf-8"))
+    text = "\n".join("".join(c.get("source", [])) for c in data.get("cells", []))
+    return [Document(page_content=text, metadata={"source_file": path.name, "type": "ipynb"})]
+
+def measure(make_iter):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    first = None
+    n = 0
+    for _ in make_iter():
+        if first is None:
+            first = time.perf_counter() - t0
+        n += 1
+    total = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return n, first or total, total, peak
+
+def main(data_dir: Path):
+    rows = []
+    for path in sorted(data_dir.iterdir()):
+        if path.suffix == ".pdf":
+            loaders = (("eager", lambda p=path: PyPDFLoader(str(p)).load()),
+                       ("stream", lambda p=path: iter_pdf(p)))
+        elif path.suffix == ".ipynb":
+            loaders = (("notebookloader", lambda p=path: NotebookLoader(str(p)).load()),
+                       ("json", lambda p=path: json_fallback(p)),
+                       ("stream", lambda p=path: iter_ipynb(p)))
+        else:
+            continue
+        for label, fn in loaders:
+            rows.append((path.name, label) + measure(fn))
+
+    print(f"{'file':40} {'loader':14} {'docs':>5} {'first ms':>9} {'total ms':>9} {'peak KiB':>9}")
+    for name, label, n, first, total, peak in rows:
+        print(f"{name[:40]:40} {label:14} {n:5d} {first * 1000:9.1f} {total * 1000:9.1f} {peak / 1024:9.1f}")
+
+if __name__ == "__main__":
+    main(Path(sys.argv[1] if len(sys.argv) > 1 else "data"))
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The repo is run from its root (streamlit run app.py), not installed as a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
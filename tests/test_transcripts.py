@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+
+import pytest
+
+loaders = pytest.importorskip("rag.loaders")
+
+FIXTURE = Path(__file__).parent / "fixtures" / "rolling_captions.vtt"
+VIDEO_ID = "abcdefghijk"
+
+EXPECTED_CUES = [
+    {"start": 0.08, "end": 2.31, "text": "welcome to this"},
+    {"start": 2.32, "end": 5.5, "text": "course on transformers"},
+    {"start": 3723.25, "end": 3724.0, "text": "final & closing words"},
+]
+
+def test_parse_vtt_raw_crlf_rolling_captions():
+    # newline="" keeps the \r\n endings so the parser sees them
+    with open(FIXTURE, "r", encoding="utf-8", newline="") as f:
+        assert loaders.parse_vtt(f) == EXPECTED_CUES
+
+def test_load_vtt_single_segment_dedups_rolling_lines():
+    docs = loaders.load_vtt(FIXTURE, VIDEO_ID)
+    assert len(docs) == 1
+    assert docs[0].page_content == "welcome to this course on transformers final & closing words"
+    meta = docs[0].metadata
+    assert meta["video_id"] == VIDEO_ID
+    assert (meta["start"], meta["end"]) == (0.08, 3724.0)
+    assert meta["timestamp"] == "0:00:00"
+    assert meta["url"] == f"https://www.youtube.com/watch?v={VIDEO_ID}&t=0s"
+
+def test_load_vtt_segment_timestamps(monkeypatch):
+    monkeypatch.setattr(loaders, "SEGMENT_CHARS", 1)  # one cue per segment
+    docs = loaders.load_vtt(FIXTURE, VIDEO_ID, title="Lecture")
+    assert [d.page_content for d in docs] == [c["text"] for c in EXPECTED_CUES]
+    assert [(d.metadata["start"], d.metadata["end"]) for d in docs] == [(c["start"], c["end"]) for c in EXPECTED_CUES]
+    assert [d.metadata["timestamp"] for d in docs] == ["0:00:00", "0:00:02", "1:02:03"]
+    assert [d.metadata["url"] for d in docs] == [
+        f"https://www.youtube.com/watch?v={VIDEO_ID}&t={t}s" for t in (0, 2, 3723)
+    ]
+    assert all(d.metadata["title"] == "Lecture" for d in docs)
+
+def test_load_youtube_transcripts_reads_cache_without_download(tmp_path, monkeypatch):
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        cues = loaders.parse_vtt(f)
+    (tmp_path / f"{VIDEO_ID}.json").write_text(
+        json.dumps({"video_id": VIDEO_ID, "title": "Lecture", "cues": cues}), encoding="utf-8"
+    )
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("yt-dlp must not be called for a cached video")
+
+    monkeypatch.setattr(loaders.yt_dlp, "YoutubeDL", no_network)
+    docs, errors = loaders.load_youtube_transcripts(
+        [f"https://www.youtube.com/watch?v={VIDEO_ID}"], cache_dir=tmp_path
+    )
+    assert errors == []
+    assert docs[0].page_content == "welcome to this course on transformers final & closing words"
+    assert docs[0].metadata["title"] == "Lecture"